@@ -1,13 +1,85 @@
 """Database operations."""
 
+import functools
+import os
+import re
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import Any
-from sqlalchemy import create_engine, func
-from sqlalchemy.orm import sessionmaker, Session
-from collections import defaultdict, Counter
-
+from sqlalchemy import Row, create_engine, event, func, insert, text, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import load_only, raiseload, selectinload, sessionmaker, Session
 from .models import Base, Recipe, MealPlan, ShoppingListItem, SavedDeal, Order, OrderItem, RecurringItem
 
+# Compiled once; each rule maps a product-name pattern to a lifespan cap
+# so _estimate_product_lifespan classifies in a single scan per name.
+_LIFESPAN_RULES = (
+    # Fresh products (short lifespan)
+    (re.compile(r"melk|milk|brød|bread|salat|lettuce", re.IGNORECASE), lambda avg: min(7, int(avg))),
+    # Dairy (medium lifespan)
+    (re.compile(r"yoghurt|ost|cheese|smør|butter", re.IGNORECASE), lambda avg: min(14, int(avg))),
+    # Hygiene/household (long lifespan, close to purchase frequency)
+    (
+        re.compile(r"såpe|soap|shampo|tannkrem|toothpaste|papir|paper", re.IGNORECASE),
+        lambda avg: int(avg * 0.9),
+    ),
+)
+
+# Compiled once; used to bucket recurring items into coarse categories.
+_CATEGORY_PATTERNS = {
+    "Dairy": re.compile(r"melk|yoghurt|ost|smør", re.IGNORECASE),
+    "Bread": re.compile(r"brød|loff|rundstykker", re.IGNORECASE),
+    "Household": re.compile(r"såpe|shampo|tannkrem|papir", re.IGNORECASE),
+}
+
+
+# Columns the listing tools actually render; skips deserializing the JSON
+# ingredient/instruction blobs per row.
+_RECIPE_LISTING_COLUMNS = (
+    Recipe.id,
+    Recipe.title,
+    Recipe.url,
+    Recipe.rating,
+    Recipe.times_used,
+    Recipe.last_used,
+    Recipe.notes,
+    Recipe.is_favorite,
+)
+
+# Columns the recurring-item tools render.
+_RECURRING_LISTING_COLUMNS = (
+    RecurringItem.product_name,
+    RecurringItem.category,
+    RecurringItem.purchase_count,
+    RecurringItem.avg_days_between_purchase,
+    RecurringItem.last_purchase,
+    RecurringItem.next_predicted_purchase,
+    RecurringItem.is_low_stock_warning,
+    RecurringItem.auto_add_to_list,
+    RecurringItem.preferred_quantity,
+    RecurringItem.typical_quantity,
+)
+
+
+# Opt-in strict mode: make accidental lazy loads on detached listing rows
+# raise instead of silently emitting queries (set ODA_STRICT_LOAD=1).
+_STRICT_LOAD = os.environ.get("ODA_STRICT_LOAD", "") not in ("", "0")
+
+
+def _apply_strict_load(query):
+    """Add raiseload('*') to a listing query when strict mode is enabled."""
+    if _STRICT_LOAD:
+        return query.options(raiseload("*"))
+    return query
+
+
+def _categorize_product(product_name: str) -> str:
+    """Bucket a product name into a coarse category for reporting."""
+    for category, pattern in _CATEGORY_PATTERNS.items():
+        if pattern.search(product_name):
+            return category
+    return "Other"
+
 
 class Database:
     """Database manager for meal planner."""
@@ -18,16 +90,154 @@ class Database:
         Args:
             database_url: SQLAlchemy database URL
         """
-        self.engine = create_engine(database_url, echo=False)
-        self.SessionLocal = sessionmaker(bind=self.engine)
+        # A generous compiled-statement cache amortizes query compilation
+        # across the module's many repeated ORM queries.
+        engine_kwargs: dict[str, Any] = {
+            "echo": False,
+            "query_cache_size": 1200,
+            # Page size for SQLAlchemy's batched multi-row INSERTs
+            "insertmanyvalues_page_size": 1000,
+        }
+        if database_url.startswith("sqlite"):
+            # The MCP tools call into the database from worker threads.
+            engine_kwargs["connect_args"] = {"check_same_thread": False}
+
+        self.engine = create_engine(database_url, **engine_kwargs)
+
+        if self.engine.dialect.name == "sqlite":
+            # WAL lets readers run concurrently with a writer, NORMAL sync
+            # cuts fsyncs per commit, and the rest keep temp/scan work in
+            # memory. Applied per-connection since pragmas don't persist.
+            @event.listens_for(self.engine, "connect")
+            def _set_sqlite_pragmas(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.execute("PRAGMA temp_store=MEMORY")
+                cursor.execute("PRAGMA mmap_size=268435456")
+                cursor.close()
+
+        # Returned objects stay readable after commit/close instead of
+        # expiring and triggering refresh attempts on detached instances
+        self.SessionLocal = sessionmaker(bind=self.engine, expire_on_commit=False)
 
         # Create tables
         Base.metadata.create_all(self.engine)
 
+        # Migrate legacy databases: create_all never alters existing
+        # tables, so add the normalized-name column and the unique index
+        # the ON CONFLICT upsert depends on, then backfill older rows
+        with self.engine.begin() as conn:
+            if self.engine.dialect.name == "sqlite":
+                columns = {
+                    row[1] for row in conn.execute(text("PRAGMA table_info(recurring_items)"))
+                }
+                if "product_name_norm" not in columns:
+                    conn.execute(text(
+                        "ALTER TABLE recurring_items ADD COLUMN product_name_norm VARCHAR"
+                    ))
+                conn.execute(text(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS ix_recurring_items_product_name_norm "
+                    "ON recurring_items (product_name_norm)"
+                ))
+            conn.execute(text(
+                "UPDATE recurring_items SET product_name_norm = lower(trim(product_name)) "
+                "WHERE product_name_norm IS NULL"
+            ))
+
+        # Memoize SELECT-by-PK, the most common query shape in plan and
+        # shopping-list rendering; cleared by every recipe write path.
+        # Built per instance so separate Database objects don't share it.
+        self._get_recipe_cached = functools.lru_cache(maxsize=512)(self._get_recipe_uncached)
+
+        # Full-text index for keyword search (SQLite FTS5 only)
+        self._fts_enabled = False
+        if self.engine.dialect.name == "sqlite":
+            self._setup_recipe_fts()
+
+    def _setup_recipe_fts(self):
+        """Create the recipe_fts virtual table and sync triggers.
+
+        Keyword search over title/description then becomes an FTS5 index
+        lookup instead of a LIKE '%kw%' table scan. Silently disabled if
+        the SQLite build lacks the FTS5 extension.
+        """
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS recipe_fts "
+                    "USING fts5(id UNINDEXED, title, description)"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS recipe_fts_insert "
+                    "AFTER INSERT ON recipes BEGIN "
+                    "INSERT INTO recipe_fts(id, title, description) "
+                    "VALUES (new.id, new.title, new.description); END"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS recipe_fts_delete "
+                    "AFTER DELETE ON recipes BEGIN "
+                    "DELETE FROM recipe_fts WHERE id = old.id; END"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS recipe_fts_update "
+                    "AFTER UPDATE ON recipes BEGIN "
+                    "DELETE FROM recipe_fts WHERE id = old.id; "
+                    "INSERT INTO recipe_fts(id, title, description) "
+                    "VALUES (new.id, new.title, new.description); END"
+                ))
+                # Backfill recipes saved before the index existed
+                conn.execute(text(
+                    "INSERT INTO recipe_fts(id, title, description) "
+                    "SELECT id, title, description FROM recipes "
+                    "WHERE id NOT IN (SELECT id FROM recipe_fts)"
+                ))
+            self._fts_enabled = True
+        except Exception:
+            self._fts_enabled = False
+
     def get_session(self) -> Session:
         """Get a new database session."""
         return self.SessionLocal()
 
+    @staticmethod
+    def _bulk_insert(session: Session, model, rows: list[dict[str, Any]]):
+        """Insert many rows as one batched Core statement.
+
+        SQLAlchemy renders this via insertmanyvalues, so the whole batch
+        goes in pages of multi-row INSERTs instead of row-at-a-time ORM
+        flushes.
+
+        Args:
+            session: Open database session
+            model: Mapped model class to insert into
+            rows: Column-value dictionaries; no-op when empty
+        """
+        if rows:
+            session.execute(insert(model), rows)
+
+    @contextmanager
+    def unit_of_work(self):
+        """Run several operations in one session and one transaction.
+
+        Status-update methods accept the yielded session so callers can
+        batch many small writes (e.g. marking a whole shopping list
+        purchased) under a single commit instead of one per call.
+
+        Yields:
+            An open Session; committed on exit, rolled back on error
+        """
+        session = self.SessionLocal()
+        try:
+            yield session
+            session.commit()
+            self._get_recipe_cached.cache_clear()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
     # Recipe operations
     def save_recipe(self, recipe_data: dict[str, Any]) -> Recipe:
         """Save a recipe to the database.
@@ -38,15 +248,54 @@ class Database:
         Returns:
             Saved Recipe object
         """
+        self.save_recipes([recipe_data])
+        return self.get_recipe(recipe_data["id"])
+
+    def save_recipes(self, recipes: list[dict[str, Any]]) -> int:
+        """Save multiple recipes in a single transaction.
+
+        Upserts the whole batch with ON CONFLICT executemany statements
+        instead of one merge (SELECT + UPDATE) per recipe. Only the keys
+        present in each dict are written, so resaving scraped data does
+        not clobber user state like ratings or favorites, and unknown
+        keys (e.g. computed pydantic fields) are ignored.
+
+        Args:
+            recipes: List of recipe data dictionaries
+
+        Returns:
+            Number of recipes saved
+        """
+        if not recipes:
+            return 0
+
+        allowed = {column.key for column in Recipe.__table__.columns}
+        cleaned = [
+            {key: value for key, value in recipe_data.items() if key in allowed}
+            for recipe_data in recipes
+        ]
+
+        # executemany needs homogeneous keys; batch rows by key set
+        # (uniform for a scraped batch, so normally one statement)
+        groups: dict[frozenset, list[dict[str, Any]]] = {}
+        for row in cleaned:
+            groups.setdefault(frozenset(row), []).append(row)
+
         with self.get_session() as session:
-            recipe = Recipe(**recipe_data)
-            session.merge(recipe)  # Use merge to handle updates
+            for rows in groups.values():
+                stmt = sqlite_insert(Recipe).values(rows)
+                update_cols = {key: stmt.excluded[key] for key in rows[0] if key != "id"}
+                if update_cols:
+                    stmt = stmt.on_conflict_do_update(index_elements=["id"], set_=update_cols)
+                else:
+                    stmt = stmt.on_conflict_do_nothing(index_elements=["id"])
+                session.execute(stmt)
             session.commit()
-            session.refresh(recipe)
-            return recipe
+        self._get_recipe_cached.cache_clear()
+        return len(recipes)
 
     def get_recipe(self, recipe_id: str) -> Recipe | None:
-        """Get a recipe by ID.
+        """Get a recipe by ID (memoized; see __init__).
 
         Args:
             recipe_id: Recipe ID
@@ -54,6 +303,9 @@ class Database:
         Returns:
             Recipe object or None
         """
+        return self._get_recipe_cached(recipe_id)
+
+    def _get_recipe_uncached(self, recipe_id: str) -> Recipe | None:
         with self.get_session() as session:
             return session.query(Recipe).filter(Recipe.id == recipe_id).first()
 
@@ -67,6 +319,7 @@ class Database:
         max_cooking_time: str | None = None,
         difficulty: str | None = None,
         limit: int = 20,
+        keyword_mode: str = "substring",
     ) -> list[Recipe]:
         """Search for recipes in the database.
 
@@ -79,6 +332,9 @@ class Database:
             max_cooking_time: Maximum cooking time (e.g., "30 min")
             difficulty: Difficulty level (e.g., "Lett", "Medium")
             limit: Maximum results
+            keyword_mode: "substring" matches anywhere in title/description
+                (FTS-backed); "prefix" matches the start of the title via
+                an indexed LIKE 'kw%' probe
 
         Returns:
             List of matching recipes
@@ -86,11 +342,23 @@ class Database:
         with self.get_session() as session:
             query = session.query(Recipe)
 
-            if keyword:
+            if keyword and keyword_mode == "prefix":
+                # Served by the ix_recipe_title_nocase functional index;
+                # autoescape keeps % and _ in user input literal
                 query = query.filter(
-                    (Recipe.title.contains(keyword))
-                    | (Recipe.description.contains(keyword))
+                    func.lower(Recipe.title).startswith(keyword.lower(), autoescape=True)
                 )
+            elif keyword:
+                matched_ids = self._fts_recipe_ids(session, keyword, limit) if self._fts_enabled else None
+                if matched_ids is not None:
+                    if not matched_ids:
+                        return []
+                    query = query.filter(Recipe.id.in_(matched_ids))
+                else:
+                    query = query.filter(
+                        (Recipe.title.contains(keyword, autoescape=True))
+                        | (Recipe.description.contains(keyword, autoescape=True))
+                    )
 
             if high_protein:
                 query = query.filter(Recipe.protein_per_serving >= 25)
@@ -110,83 +378,137 @@ class Database:
             query = query.limit(limit)
             return query.all()
 
-    def mark_as_favorite(self, recipe_id: str, is_favorite: bool = True):
+    def _fts_recipe_ids(self, session: Session, keyword: str, limit: int) -> list[str] | None:
+        """Resolve a keyword to matching recipe IDs via the FTS5 index.
+
+        The keyword is quoted so user input is matched as a literal phrase
+        rather than parsed as FTS query syntax. Returns None on failure so
+        the caller can fall back to a LIKE scan.
+
+        Args:
+            session: Open database session
+            keyword: Search keyword
+            limit: Maximum number of IDs to return
+
+        Returns:
+            Recipe IDs ranked by relevance, or None if the lookup failed
+        """
+        quoted = '"%s"' % keyword.replace('"', '""')
+        try:
+            rows = session.execute(
+                text(
+                    "SELECT id FROM recipe_fts WHERE recipe_fts MATCH :q "
+                    "ORDER BY rank LIMIT :lim"
+                ),
+                {"q": quoted, "lim": limit},
+            ).all()
+        except Exception:
+            return None
+        return [row[0] for row in rows]
+
+    def mark_as_favorite(
+        self, recipe_id: str, is_favorite: bool = True, session: Session | None = None
+    ):
         """Mark a recipe as favorite.
 
         Args:
             recipe_id: Recipe ID
             is_favorite: True to favorite, False to unfavorite
+            session: Open session from unit_of_work; the caller then owns the commit
         """
+        if session is not None:
+            self._mark_as_favorite_in_session(session, recipe_id, is_favorite)
+            return
         with self.get_session() as session:
-            recipe = session.query(Recipe).filter(Recipe.id == recipe_id).first()
-            if recipe:
-                recipe.is_favorite = is_favorite
-                session.commit()
+            self._mark_as_favorite_in_session(session, recipe_id, is_favorite)
+            session.commit()
+        self._get_recipe_cached.cache_clear()
+
+    def _mark_as_favorite_in_session(self, session: Session, recipe_id: str, is_favorite: bool):
+        recipe = session.query(Recipe).filter(Recipe.id == recipe_id).first()
+        if recipe:
+            recipe.is_favorite = is_favorite
 
-    def rate_recipe(self, recipe_id: str, rating: int, notes: str | None = None):
+    def rate_recipe(
+        self,
+        recipe_id: str,
+        rating: int,
+        notes: str | None = None,
+        session: Session | None = None,
+    ):
         """Rate a recipe and optionally add notes.
 
         Args:
             recipe_id: Recipe ID
             rating: Rating (1-5 stars)
             notes: Optional notes about the recipe
+            session: Open session from unit_of_work; the caller then owns the commit
         """
+        if session is not None:
+            self._rate_recipe_in_session(session, recipe_id, rating, notes)
+            return
         with self.get_session() as session:
-            recipe = session.query(Recipe).filter(Recipe.id == recipe_id).first()
-            if recipe:
-                recipe.rating = max(1, min(5, rating))  # Ensure 1-5
-                if notes:
-                    recipe.notes = notes
-                session.commit()
-
-    def get_favorites(self, limit: int = 20) -> list[Recipe]:
+            self._rate_recipe_in_session(session, recipe_id, rating, notes)
+            session.commit()
+        self._get_recipe_cached.cache_clear()
+
+    def _rate_recipe_in_session(
+        self, session: Session, recipe_id: str, rating: int, notes: str | None
+    ):
+        recipe = session.query(Recipe).filter(Recipe.id == recipe_id).first()
+        if recipe:
+            recipe.rating = max(1, min(5, rating))  # Ensure 1-5
+            if notes:
+                recipe.notes = notes
+
+    def get_favorites(self, limit: int = 20) -> list[Row]:
         """Get favorite recipes.
 
         Args:
             limit: Maximum results
 
         Returns:
-            List of favorite recipes
+            List of favorite recipe rows (listing columns only)
         """
         with self.get_session() as session:
             return (
-                session.query(Recipe)
+                session.query(*_RECIPE_LISTING_COLUMNS)
                 .filter(Recipe.is_favorite == True)
                 .order_by(Recipe.rating.desc(), Recipe.times_used.desc())
                 .limit(limit)
                 .all()
             )
 
-    def get_recipe_history(self, limit: int = 20) -> list[Recipe]:
+    def get_recipe_history(self, limit: int = 20) -> list[Row]:
         """Get recently used recipes.
 
         Args:
             limit: Maximum results
 
         Returns:
-            List of recipes ordered by last use
+            List of recipe rows ordered by last use (listing columns only)
         """
         with self.get_session() as session:
             return (
-                session.query(Recipe)
+                session.query(*_RECIPE_LISTING_COLUMNS)
                 .filter(Recipe.last_used.isnot(None))
                 .order_by(Recipe.last_used.desc())
                 .limit(limit)
                 .all()
             )
 
-    def get_popular_recipes(self, limit: int = 20) -> list[Recipe]:
+    def get_popular_recipes(self, limit: int = 20) -> list[Row]:
         """Get most frequently used recipes.
 
         Args:
             limit: Maximum results
 
         Returns:
-            List of recipes ordered by usage count
+            List of recipe rows ordered by usage count (listing columns only)
         """
         with self.get_session() as session:
             return (
-                session.query(Recipe)
+                session.query(*_RECIPE_LISTING_COLUMNS)
                 .filter(Recipe.times_used > 0)
                 .order_by(Recipe.times_used.desc(), Recipe.rating.desc())
                 .limit(limit)
@@ -219,15 +541,22 @@ class Database:
             )
             session.add(meal_plan)
 
-            # Update recipe's last_used timestamp and usage count
-            recipe = session.query(Recipe).filter(Recipe.id == recipe_id).first()
-            if recipe:
-                recipe.last_used = datetime.utcnow()
-                recipe.times_used = (recipe.times_used or 0) + 1
+            # Update recipe's last_used timestamp and usage count in a
+            # single UPDATE; the in-database increment is also race-free
+            session.execute(
+                update(Recipe)
+                .where(Recipe.id == recipe_id)
+                .values(
+                    last_used=datetime.utcnow(),
+                    times_used=func.coalesce(Recipe.times_used, 0) + 1,
+                )
+            )
 
             session.commit()
             session.refresh(meal_plan)
-            return meal_plan
+
+        self._get_recipe_cached.cache_clear()
+        return meal_plan
 
     def get_meal_plan(self, week_number: int, year: int) -> list[MealPlan]:
         """Get meal plan for a specific week.
@@ -240,8 +569,32 @@ class Database:
             List of MealPlan objects for that week
         """
         with self.get_session() as session:
+            # selectinload fetches the recipes in one IN query; a joined
+            # load would duplicate the wide JSON columns per plan row
             return (
                 session.query(MealPlan)
+                .options(selectinload(MealPlan.recipe))
+                .filter(MealPlan.week_number == week_number, MealPlan.year == year)
+                .order_by(MealPlan.day_of_week)
+                .all()
+            )
+
+    def get_meal_plan_with_recipes(
+        self, week_number: int, year: int
+    ) -> list[tuple[MealPlan, Recipe]]:
+        """Get meal plan for a week joined with its recipes in one query.
+
+        Args:
+            week_number: ISO week number
+            year: Year
+
+        Returns:
+            List of (MealPlan, Recipe) tuples ordered by day of week
+        """
+        with self.get_session() as session:
+            return (
+                session.query(MealPlan, Recipe)
+                .join(Recipe, MealPlan.recipe_id == Recipe.id)
                 .filter(MealPlan.week_number == week_number, MealPlan.year == year)
                 .order_by(MealPlan.day_of_week)
                 .all()
@@ -255,9 +608,11 @@ class Database:
             year: Year
         """
         with self.get_session() as session:
+            # Nothing else in this short-lived session holds the rows, so
+            # skip the identity-map synchronization pass
             session.query(MealPlan).filter(
                 MealPlan.week_number == week_number, MealPlan.year == year
-            ).delete()
+            ).delete(synchronize_session=False)
             session.commit()
 
     # Shopping list operations
@@ -303,6 +658,23 @@ class Database:
             session.refresh(item)
             return item
 
+    def add_shopping_list_items(self, items: list[dict[str, Any]]) -> int:
+        """Add multiple shopping list items in a single transaction.
+
+        Args:
+            items: List of dicts with ShoppingListItem column values
+
+        Returns:
+            Number of items added
+        """
+        if not items:
+            return 0
+
+        with self.get_session() as session:
+            self._bulk_insert(session, ShoppingListItem, items)
+            session.commit()
+        return len(items)
+
     def get_shopping_list(self, week_number: int, year: int) -> list[ShoppingListItem]:
         """Get shopping list for a specific week.
 
@@ -324,30 +696,44 @@ class Database:
                 .all()
             )
 
-    def mark_item_purchased(self, item_id: int):
+    def mark_item_purchased(self, item_id: int, session: Session | None = None):
         """Mark a shopping list item as purchased.
 
         Args:
             item_id: ShoppingListItem ID
+            session: Open session from unit_of_work; the caller then owns the commit
         """
+        if session is not None:
+            self._mark_item_purchased_in_session(session, item_id)
+            return
         with self.get_session() as session:
-            item = session.query(ShoppingListItem).filter(ShoppingListItem.id == item_id).first()
-            if item:
-                item.purchased = True
-                item.purchased_at = datetime.utcnow()
-                session.commit()
+            self._mark_item_purchased_in_session(session, item_id)
+            session.commit()
 
-    def mark_item_in_cart(self, item_id: int):
+    def _mark_item_purchased_in_session(self, session: Session, item_id: int):
+        item = session.query(ShoppingListItem).filter(ShoppingListItem.id == item_id).first()
+        if item:
+            item.purchased = True
+            item.purchased_at = datetime.utcnow()
+
+    def mark_item_in_cart(self, item_id: int, session: Session | None = None):
         """Mark a shopping list item as added to cart.
 
         Args:
             item_id: ShoppingListItem ID
+            session: Open session from unit_of_work; the caller then owns the commit
         """
+        if session is not None:
+            self._mark_item_in_cart_in_session(session, item_id)
+            return
         with self.get_session() as session:
-            item = session.query(ShoppingListItem).filter(ShoppingListItem.id == item_id).first()
-            if item:
-                item.in_cart = True
-                session.commit()
+            self._mark_item_in_cart_in_session(session, item_id)
+            session.commit()
+
+    def _mark_item_in_cart_in_session(self, session: Session, item_id: int):
+        item = session.query(ShoppingListItem).filter(ShoppingListItem.id == item_id).first()
+        if item:
+            item.in_cart = True
 
     def clear_shopping_list(self, week_number: int, year: int):
         """Clear shopping list for a specific week.
@@ -359,7 +745,7 @@ class Database:
         with self.get_session() as session:
             session.query(ShoppingListItem).filter(
                 ShoppingListItem.week_number == week_number, ShoppingListItem.year == year
-            ).delete()
+            ).delete(synchronize_session=False)
             session.commit()
 
     # Deal operations
@@ -421,48 +807,92 @@ class Database:
             Saved Order object
         """
         with self.get_session() as session:
-            # Check if order already exists
-            existing = session.query(Order).filter(
-                Order.order_number == order_data['order_number']
-            ).first()
+            order_id = self._save_order_in_session(session, order_data)
+            session.commit()
+            return session.get(Order, order_id, options=[selectinload(Order.items)])
+
+    def save_orders(self, orders: list[dict[str, Any]]) -> int:
+        """Save multiple orders in a single transaction.
+
+        One commit for the whole scraped batch instead of one per order.
+
+        Args:
+            orders: List of order data dictionaries (see save_order)
+
+        Returns:
+            Number of orders saved
+        """
+        if not orders:
+            return 0
+
+        with self.get_session() as session:
+            for order_data in orders:
+                self._save_order_in_session(session, order_data)
+            session.commit()
+            return len(orders)
+
+    def _save_order_in_session(self, session: Session, order_data: dict[str, Any]) -> int:
+        """Insert or update one order (and its items) within an open session.
 
-            if existing:
-                # Update existing order
-                existing.total_price = order_data.get('total_price')
-                existing.status = order_data.get('status')
-                order = existing
-            else:
-                # Create new order
-                order = Order(
+        Uses Core statements throughout the ingest path: the insert fetches
+        the new order id via RETURNING (no separate flush round-trip) and
+        the items go in as one executemany.
+
+        Returns:
+            The order's primary key
+        """
+        # Check if order already exists
+        order_id = (
+            session.query(Order.id)
+            .filter(Order.order_number == order_data['order_number'])
+            .scalar()
+        )
+
+        if order_id is not None:
+            # Update existing order
+            session.execute(
+                update(Order)
+                .where(Order.id == order_id)
+                .values(
+                    total_price=order_data.get('total_price'),
+                    status=order_data.get('status'),
+                )
+            )
+        else:
+            # Create new order; RETURNING yields the id in the same statement
+            order_id = session.execute(
+                insert(Order)
+                .values(
                     order_number=order_data['order_number'],
                     order_date=order_data['order_date'],
                     total_price=order_data.get('total_price'),
-                    status=order_data.get('status', 'delivered')
+                    status=order_data.get('status', 'delivered'),
                 )
-                session.add(order)
-                session.flush()  # Get order ID
-
-            # Add items
-            for item_data in order_data.get('items', []):
-                # Check if item already exists
-                existing_item = session.query(OrderItem).filter(
-                    OrderItem.order_id == order.id,
-                    OrderItem.product_name == item_data['product_name']
-                ).first()
-
-                if not existing_item:
-                    item = OrderItem(
-                        order_id=order.id,
-                        product_name=item_data['product_name'],
-                        quantity=item_data.get('quantity', 1),
-                        price_per_unit=item_data.get('price'),
-                        total_price=item_data.get('price')
-                    )
-                    session.add(item)
-
-            session.commit()
-            session.refresh(order)
-            return order
+                .returning(Order.id)
+            ).scalar_one()
+
+        # Add items; prefetch existing names once instead of one SELECT per item
+        existing_names = {
+            name
+            for (name,) in session.query(OrderItem.product_name)
+            .filter(OrderItem.order_id == order_id)
+            .all()
+        }
+
+        item_rows = [
+            {
+                'order_id': order_id,
+                'product_name': item_data['product_name'],
+                'quantity': item_data.get('quantity', 1),
+                'price_per_unit': item_data.get('price'),
+                'total_price': item_data.get('price'),
+            }
+            for item_data in order_data.get('items', [])
+            if item_data['product_name'] not in existing_names
+        ]
+        self._bulk_insert(session, OrderItem, item_rows)
+
+        return order_id
 
     def get_all_orders(self, limit: int = 100) -> list[Order]:
         """Get all orders sorted by date (newest first).
@@ -474,7 +904,12 @@ class Database:
             List of Order objects
         """
         with self.get_session() as session:
-            return session.query(Order).order_by(Order.order_date.desc()).limit(limit).all()
+            return (
+                _apply_strict_load(session.query(Order))
+                .order_by(Order.order_date.desc())
+                .limit(limit)
+                .all()
+            )
 
     def analyze_recurring_items(self, min_purchases: int = 3) -> list[RecurringItem]:
         """Analyze order history to identify recurring items.
@@ -488,36 +923,32 @@ class Database:
             List of RecurringItem objects
         """
         with self.get_session() as session:
-            # Get all order items
-            all_items = session.query(OrderItem).join(Order).all()
-
-            # Group by product name
-            product_purchases = defaultdict(list)
-
-            for item in all_items:
-                # Normalize product name (lowercase, strip whitespace)
-                normalized_name = item.product_name.strip().lower()
-                product_purchases[normalized_name].append({
-                    'date': item.order.order_date,
-                    'quantity': item.quantity,
-                    'price': item.price_per_unit
-                })
-
-            # Analyze each product
-            recurring_items = []
-
-            for product_name, purchases in product_purchases.items():
-                if len(purchases) < min_purchases:
-                    continue
-
-                # Sort by date
-                purchases = sorted(purchases, key=lambda x: x['date'])
+            # Aggregate per product in the database; only one summary row
+            # per recurring candidate crosses the DB boundary instead of
+            # the entire order-item history
+            normalized_name = func.lower(func.trim(OrderItem.product_name)).label("name")
+            stats = (
+                session.query(
+                    normalized_name,
+                    func.count().label("cnt"),
+                    func.min(Order.order_date).label("first"),
+                    func.max(Order.order_date).label("last"),
+                    func.avg(OrderItem.quantity).label("avg_quantity"),
+                )
+                .join(Order)
+                .group_by(normalized_name)
+                .having(func.count() >= min_purchases)
+                .all()
+            )
 
-                # Calculate statistics
-                purchase_count = len(purchases)
-                first_purchase = purchases[0]['date']
-                last_purchase = purchases[-1]['date']
+            if not stats:
+                return []
 
+            # Build one row per candidate and upsert them all in a single
+            # ON CONFLICT statement instead of SELECT-then-update per product
+            now = datetime.utcnow()
+            rows = []
+            for product_name, purchase_count, first_purchase, last_purchase, avg_quantity in stats:
                 # Calculate average days between purchases
                 if purchase_count > 1:
                     total_days = (last_purchase - first_purchase).days
@@ -525,55 +956,49 @@ class Database:
                 else:
                     avg_days = 30  # Default to monthly if only 1 purchase
 
-                # Calculate typical quantity
-                quantities = [p['quantity'] for p in purchases]
-                typical_quantity = int(sum(quantities) / len(quantities))
-
-                # Estimate days supply (heuristic based on product type)
-                estimated_days_supply = self._estimate_product_lifespan(product_name, avg_days)
-
                 # Predict next purchase date
                 next_predicted = last_purchase + timedelta(days=int(avg_days))
 
                 # Check if low stock warning needed (within 3 days of predicted date)
                 days_until_next = (next_predicted - datetime.now()).days
-                is_low_stock = days_until_next <= 3
-
-                # Check if already exists in database
-                existing = session.query(RecurringItem).filter(
-                    func.lower(RecurringItem.product_name) == product_name.lower()
-                ).first()
-
-                if existing:
-                    # Update existing
-                    existing.purchase_count = purchase_count
-                    existing.last_purchase = last_purchase
-                    existing.avg_days_between_purchase = avg_days
-                    existing.typical_quantity = typical_quantity
-                    existing.estimated_days_supply = estimated_days_supply
-                    existing.next_predicted_purchase = next_predicted
-                    existing.is_low_stock_warning = is_low_stock
-                    existing.updated_at = datetime.utcnow()
-                    recurring_item = existing
-                else:
-                    # Create new
-                    recurring_item = RecurringItem(
-                        product_name=product_name,
-                        purchase_count=purchase_count,
-                        first_purchase=first_purchase,
-                        last_purchase=last_purchase,
-                        avg_days_between_purchase=avg_days,
-                        typical_quantity=typical_quantity,
-                        estimated_days_supply=estimated_days_supply,
-                        next_predicted_purchase=next_predicted,
-                        is_low_stock_warning=is_low_stock
-                    )
-                    session.add(recurring_item)
 
-                recurring_items.append(recurring_item)
+                rows.append({
+                    "product_name": product_name,
+                    "product_name_norm": product_name,
+                    "category": _categorize_product(product_name),
+                    "purchase_count": purchase_count,
+                    "first_purchase": first_purchase,
+                    "last_purchase": last_purchase,
+                    "avg_days_between_purchase": avg_days,
+                    "typical_quantity": int(avg_quantity),
+                    "estimated_days_supply": self._estimate_product_lifespan(product_name, avg_days),
+                    "next_predicted_purchase": next_predicted,
+                    "is_low_stock_warning": days_until_next <= 3,
+                })
 
+            stmt = sqlite_insert(RecurringItem).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["product_name_norm"],
+                set_={
+                    "purchase_count": stmt.excluded.purchase_count,
+                    "last_purchase": stmt.excluded.last_purchase,
+                    "avg_days_between_purchase": stmt.excluded.avg_days_between_purchase,
+                    "typical_quantity": stmt.excluded.typical_quantity,
+                    "estimated_days_supply": stmt.excluded.estimated_days_supply,
+                    "next_predicted_purchase": stmt.excluded.next_predicted_purchase,
+                    "is_low_stock_warning": stmt.excluded.is_low_stock_warning,
+                    "category": stmt.excluded.category,
+                    "updated_at": now,
+                },
+            )
+            session.execute(stmt)
             session.commit()
-            return recurring_items
+
+            return (
+                session.query(RecurringItem)
+                .filter(RecurringItem.product_name_norm.in_([r["product_name_norm"] for r in rows]))
+                .all()
+            )
 
     def _estimate_product_lifespan(self, product_name: str, avg_days_between: float) -> int:
         """Estimate how long a product typically lasts based on its name.
@@ -585,19 +1010,9 @@ class Database:
         Returns:
             Estimated days the product lasts
         """
-        product_lower = product_name.lower()
-
-        # Fresh products (short lifespan)
-        if any(word in product_lower for word in ['melk', 'milk', 'brød', 'bread', 'salat', 'lettuce']):
-            return min(7, int(avg_days_between))
-
-        # Dairy (medium lifespan)
-        if any(word in product_lower for word in ['yoghurt', 'ost', 'cheese', 'smør', 'butter']):
-            return min(14, int(avg_days_between))
-
-        # Hygiene/household (long lifespan)
-        if any(word in product_lower for word in ['såpe', 'soap', 'shampo', 'tannkrem', 'toothpaste', 'papir', 'paper']):
-            return int(avg_days_between * 0.9)  # Close to purchase frequency
+        for pattern, estimate in _LIFESPAN_RULES:
+            if pattern.search(product_name):
+                return estimate(avg_days_between)
 
         # Default: assume purchase frequency = consumption rate
         return int(avg_days_between)
@@ -614,22 +1029,55 @@ class Database:
         with self.get_session() as session:
             return (
                 session.query(RecurringItem)
+                .options(load_only(*_RECURRING_LISTING_COLUMNS))
                 .order_by(RecurringItem.purchase_count.desc())
                 .limit(limit)
                 .all()
             )
 
-    def get_low_stock_items(self) -> list[RecurringItem]:
+    def get_recurring_items_by_names(self, product_names: list[str]) -> list[RecurringItem]:
+        """Get recurring items matching the given names (case-insensitive).
+
+        Args:
+            product_names: Product names to look up
+
+        Returns:
+            List of matching RecurringItem objects
+        """
+        if not product_names:
+            return []
+
+        lowered = [name.strip().lower() for name in product_names]
+        with self.get_session() as session:
+            return (
+                session.query(RecurringItem)
+                .filter(RecurringItem.product_name_norm.in_(lowered))
+                .all()
+            )
+
+    # How many days ahead a predicted purchase counts as "running low"
+    LOW_STOCK_WINDOW_DAYS = 3
+
+    def get_low_stock_items(self, limit: int = 100) -> list[RecurringItem]:
         """Get items that are predicted to run out soon.
 
+        Filters on the predicted purchase date in SQL, so the stored
+        is_low_stock_warning flag can't go stale between analyses.
+
+        Args:
+            limit: Maximum number of items to return
+
         Returns:
-            List of RecurringItem objects with is_low_stock_warning=True
+            List of RecurringItem objects due within LOW_STOCK_WINDOW_DAYS
         """
+        cutoff = datetime.now() + timedelta(days=self.LOW_STOCK_WINDOW_DAYS)
         with self.get_session() as session:
             return (
                 session.query(RecurringItem)
-                .filter(RecurringItem.is_low_stock_warning == True)
+                .options(load_only(*_RECURRING_LISTING_COLUMNS))
+                .filter(RecurringItem.next_predicted_purchase <= cutoff)
                 .order_by(RecurringItem.next_predicted_purchase)
+                .limit(limit)
                 .all()
             )
 
@@ -643,7 +1091,7 @@ class Database:
         """
         with self.get_session() as session:
             item = session.query(RecurringItem).filter(
-                func.lower(RecurringItem.product_name) == product_name.lower()
+                RecurringItem.product_name_norm == product_name.strip().lower()
             ).first()
 
             if item:
@@ -1,11 +1,27 @@
 """SQLAlchemy database models."""
 
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, JSON
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
-
-Base = declarative_base()
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    CheckConstraint,
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+    Text,
+    func,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase, relationship
+
+
+class Base(DeclarativeBase):
+    """Declarative base for all models (SQLAlchemy 2.0 style)."""
 
 
 class Recipe(Base):
@@ -23,39 +39,62 @@ class Recipe(Base):
     cooking_time = Column(String)
     difficulty = Column(String)
 
-    ingredients = Column(JSON)  # List of ingredients as JSON
-    instructions = Column(JSON)  # List of instructions as JSON
-    categories = Column(JSON)  # List of categories
-    tags = Column(JSON)  # List of tags
+    # Plain JSON on SQLite, binary JSONB on PostgreSQL so reads skip
+    # re-parsing and the GIN indexes below serve containment queries
+    ingredients = Column(JSON().with_variant(JSONB(), "postgresql"))  # List of ingredients as JSON
+    instructions = Column(JSON().with_variant(JSONB(), "postgresql"))  # List of instructions as JSON
+    categories = Column(JSON().with_variant(JSONB(), "postgresql"))  # List of categories
+    tags = Column(JSON().with_variant(JSONB(), "postgresql"))  # List of tags
 
     protein_per_serving = Column(Float)
     calories_per_serving = Column(Float)
 
-    # Metadata
-    created_at = Column(DateTime, default=datetime.utcnow)
-    last_used = Column(DateTime)
-    times_used = Column(Integer, default=0)  # How many times this recipe has been used
+    # Metadata (indexed: the history/popular listings filter and sort on these)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used = Column(DateTime, index=True)
+    times_used = Column(Integer, default=0, index=True)  # How many times this recipe has been used
 
-    # User preferences
-    is_favorite = Column(Boolean, default=False)
-    rating = Column(Integer)  # 1-5 stars
+    # User preferences (indexed for the favorites listing)
+    is_favorite = Column(Boolean, default=False, index=True)
+    rating = Column(SmallInteger, CheckConstraint("rating BETWEEN 1 AND 5"), index=True)  # 1-5 stars
     notes = Column(Text)  # User notes about the recipe
 
-    # Relationships
-    meal_plans = relationship("MealPlan", back_populates="recipe")
+    # Relationships; the reverse direction is never wanted, so make any
+    # accidental traversal fail loudly instead of emitting a query
+    meal_plans = relationship("MealPlan", back_populates="recipe", lazy="raise")
+
+
+# Functional index serving case-insensitive title-prefix search
+Index("ix_recipe_title_nocase", func.lower(Recipe.title))
+
+# GIN indexes for JSONB containment filters; only emitted on PostgreSQL
+# since SQLite has no GIN access method
+Index("ix_recipe_tags_gin", Recipe.tags, postgresql_using="gin").ddl_if(dialect="postgresql")
+Index("ix_recipe_categories_gin", Recipe.categories, postgresql_using="gin").ddl_if(
+    dialect="postgresql"
+)
 
 
 class MealPlan(Base):
     """Weekly meal plan."""
 
     __tablename__ = "meal_plans"
+    __table_args__ = (Index("ix_mealplan_week_year", "week_number", "year", "day_of_week"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    recipe_id = Column(String, ForeignKey("recipes.id"), nullable=False)
+    recipe_id = Column(String, ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False)
 
     # Which day and meal
-    day_of_week = Column(Integer, nullable=False)  # 0=Monday, 6=Sunday
-    meal_type = Column(String, default="dinner")  # breakfast, lunch, dinner
+    day_of_week = Column(
+        SmallInteger, CheckConstraint("day_of_week BETWEEN 0 AND 6"), nullable=False
+    )  # 0=Monday, 6=Sunday
+    meal_type = Column(
+        Enum(
+            "breakfast", "lunch", "dinner",
+            name="meal_type", native_enum=False, create_constraint=True,
+        ),
+        default="dinner",
+    )
 
     # When this plan was created
     week_number = Column(Integer, nullable=False)  # ISO week number
@@ -64,7 +103,7 @@ class MealPlan(Base):
     servings = Column(Integer, default=4)
     notes = Column(Text)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     recipe = relationship("Recipe", back_populates="meal_plans")
@@ -74,6 +113,7 @@ class ShoppingListItem(Base):
     """Shopping list items."""
 
     __tablename__ = "shopping_list"
+    __table_args__ = (Index("ix_shoppinglist_week_year", "week_number", "year", "purchased"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
@@ -93,7 +133,7 @@ class ShoppingListItem(Base):
     week_number = Column(Integer)
     year = Column(Integer)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     purchased_at = Column(DateTime)
 
 
@@ -113,7 +153,7 @@ class SavedDeal(Base):
     valid_from = Column(DateTime)
     valid_until = Column(DateTime)
 
-    saved_at = Column(DateTime, default=datetime.utcnow)
+    saved_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
 class Order(Base):
@@ -123,26 +163,30 @@ class Order(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     order_number = Column(String, unique=True, nullable=False)  # Oda order reference number
-    order_date = Column(DateTime, nullable=False)
+    order_date = Column(DateTime, nullable=False, index=True)  # Recurring-item analytics scan by date
     delivery_date = Column(DateTime)
     total_price = Column(Float)
 
     # Status tracking
     status = Column(String)  # "delivered", "cancelled", etc.
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    # Relationships
-    items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
+    # Relationships; items are read whenever an order is, so load them
+    # eagerly in one IN query
+    items = relationship(
+        "OrderItem", back_populates="order", cascade="all, delete-orphan", lazy="selectin"
+    )
 
 
 class OrderItem(Base):
     """Individual items in an order."""
 
     __tablename__ = "order_items"
+    __table_args__ = (Index("ix_orderitem_order_name", "order_id", "product_name"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
 
     product_name = Column(String, nullable=False)
     quantity = Column(Integer, default=1)
@@ -167,9 +211,10 @@ class RecurringItem(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     product_name = Column(String, nullable=False, unique=True)
+    product_name_norm = Column(String, unique=True, index=True)  # Pre-lowered, upsert conflict target
 
     # Purchase frequency analysis
-    purchase_count = Column(Integer, default=0)  # How many times purchased total
+    purchase_count = Column(Integer, default=0, index=True)  # How many times purchased total
     first_purchase = Column(DateTime)
     last_purchase = Column(DateTime)
     avg_days_between_purchase = Column(Float)  # Average days between purchases
@@ -188,8 +233,8 @@ class RecurringItem(Base):
     preferred_quantity = Column(Integer, default=1)  # User's preferred quantity
 
     # Predictions
-    next_predicted_purchase = Column(DateTime)  # When we predict they'll need this next
-    is_low_stock_warning = Column(Boolean, default=False)  # Currently running low
+    next_predicted_purchase = Column(DateTime, index=True)  # When we predict they'll need this next
+    is_low_stock_warning = Column(Boolean, default=False, index=True)  # Currently running low
 
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,14 +1,39 @@
 """Kassal.app API client."""
 
+import asyncio
+import random
+import time
+
 import httpx
-from typing import Any
+from typing import Any, AsyncIterator, Callable
 
 from .models import Product, ProductSearch, ProductSearchParams
 
+try:
+    import orjson
+
+    def _loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+except ImportError:
+    import json
+
+    def _loads(data: bytes) -> Any:
+        return json.loads(data)
+
 
 class KassalClient:
     """Client for interacting with Kassal.app API."""
 
+    # How long idempotent product lookups may be served from cache
+    CACHE_TTL_SECONDS = 300.0
+
+    # Retry policy for transient API failures; connect-level failures
+    # are already retried by the transport
+    MAX_ATTEMPTS = 4
+    BACKOFF_BASE_SECONDS = 0.2
+    BACKOFF_CAP_SECONDS = 4.0
+
     def __init__(self, api_key: str, base_url: str = "https://kassal.app/api/v1"):
         """Initialize Kassal API client.
 
@@ -21,7 +46,70 @@ class KassalClient:
             "Authorization": f"Bearer {api_key}",
             "Accept": "application/json",
         }
-        self.client = httpx.AsyncClient(headers=self.headers, timeout=30.0)
+        # Pool sized to serve concurrent fan-outs (e.g. one request per
+        # ingredient) without queueing on connection checkout; HTTP/2
+        # multiplexes the fan-out over one TLS connection, and the
+        # transport retries transient connection failures twice
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=30.0,
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=2,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            ),
+        )
+
+        # TTL caches for the idempotent lookups; resolving the same
+        # ingredient across recipes otherwise repeats identical requests
+        self._product_cache: dict[int, tuple[float, Product]] = {}
+        self._ean_cache: dict[str, tuple[float, list[Product]]] = {}
+
+    def _cache_get(self, cache: dict, key: Any) -> Any | None:
+        """Return a cached value if present and fresh, else None."""
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        cached_at, value = entry
+        if time.monotonic() - cached_at > self.CACHE_TTL_SECONDS:
+            del cache[key]
+            return None
+        return value
+
+    async def _get(self, url: str, params: dict | None = None) -> httpx.Response:
+        """GET with retry on transient status codes.
+
+        429 and 5xx responses are retried with exponential backoff and
+        jitter, honouring a Retry-After header when the server sends
+        one. Other error statuses raise immediately.
+
+        Args:
+            url: Absolute request URL
+            params: Optional query parameters
+
+        Returns:
+            The successful response
+
+        Raises:
+            httpx.HTTPStatusError: If the request still fails after retries
+        """
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            response = await self.client.get(url, params=params)
+            if response.status_code < 400:
+                return response
+            retryable = response.status_code == 429 or response.status_code >= 500
+            if not retryable or attempt == self.MAX_ATTEMPTS:
+                response.raise_for_status()
+            retry_after = response.headers.get("Retry-After")
+            if retry_after is not None and retry_after.isdigit():
+                delay = float(retry_after)
+            else:
+                delay = min(
+                    self.BACKOFF_CAP_SECONDS,
+                    self.BACKOFF_BASE_SECONDS * 2 ** (attempt - 1),
+                ) * (0.5 + random.random())
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")  # loop always returns or raises
 
     async def close(self):
         """Close the HTTP client."""
@@ -47,24 +135,10 @@ class KassalClient:
         Raises:
             httpx.HTTPError: If the request fails
         """
-        query_params = {}
-        for k, v in params.model_dump(exclude_none=True).items():
-            if v is not None:
-                # Convert booleans to integers for API compatibility
-                if isinstance(v, bool):
-                    query_params[k] = int(v)
-                else:
-                    query_params[k] = v
-
-        # Handle list parameters
-        if params.excl_allergens:
-            query_params["excl_allergens"] = ",".join(params.excl_allergens)
-        if params.has_labels:
-            query_params["has_labels"] = ",".join(params.has_labels)
-
-        response = await self.client.get(f"{self.base_url}/products", params=query_params)
-        response.raise_for_status()
-        return ProductSearch(**response.json())
+        response = await self._get(f"{self.base_url}/products", params=params.to_query())
+        # model_validate keeps parsing inside pydantic-core rather
+        # than splatting a large dict through __init__
+        return ProductSearch.model_validate(_loads(response.content))
 
     async def get_product(self, product_id: int) -> Product:
         """Get detailed product information by ID.
@@ -78,9 +152,38 @@ class KassalClient:
         Raises:
             httpx.HTTPError: If the request fails
         """
-        response = await self.client.get(f"{self.base_url}/products/id/{product_id}")
-        response.raise_for_status()
-        return Product(**response.json()["data"])
+        cached = self._cache_get(self._product_cache, product_id)
+        if cached is not None:
+            return cached
+
+        response = await self._get(f"{self.base_url}/products/id/{product_id}")
+        product = Product.model_validate(_loads(response.content)["data"])
+        self._product_cache[product_id] = (time.monotonic(), product)
+        return product
+
+    async def get_products(self, product_ids: list[int]) -> list[Product]:
+        """Get detailed information for several products at once.
+
+        Prefer this over awaiting get_product in a loop: lookups run
+        concurrently (at most 8 in flight) and fresh cache hits skip the
+        network entirely.
+
+        Args:
+            product_ids: Product IDs, order preserved in the result
+
+        Returns:
+            List of Product objects
+
+        Raises:
+            httpx.HTTPError: If any request fails
+        """
+        semaphore = asyncio.Semaphore(8)
+
+        async def fetch(product_id: int) -> Product:
+            async with semaphore:
+                return await self.get_product(product_id)
+
+        return list(await asyncio.gather(*(fetch(product_id) for product_id in product_ids)))
 
     async def get_product_by_ean(self, ean: str) -> list[Product]:
         """Get product by EAN/barcode with cross-store comparison.
@@ -94,19 +197,81 @@ class KassalClient:
         Raises:
             httpx.HTTPError: If the request fails
         """
-        response = await self.client.get(f"{self.base_url}/products/ean/{ean}")
-        response.raise_for_status()
-        data = response.json()
-        return [Product(**p) for p in data.get("data", [])]
+        cached = self._cache_get(self._ean_cache, ean)
+        if cached is not None:
+            return cached
+
+        response = await self._get(f"{self.base_url}/products/ean/{ean}")
+        data = _loads(response.content)
+        products = [Product.model_validate(p) for p in data.get("data", [])]
+        self._ean_cache[ean] = (time.monotonic(), products)
+        return products
+
+    # Page size and scan budget for the client-side filter scans below;
+    # Kassal has no discount or nutrition filters, so pages are fetched
+    # small and the scan stops as soon as enough matches are collected
+    SCAN_PAGE_SIZE = 25
+    SCAN_MAX_PAGES = 8
+
+    async def iter_products(self, params: ProductSearchParams) -> AsyncIterator[Product]:
+        """Stream search results page by page.
+
+        The next page is only fetched when the consumer has drained the
+        current one, so breaking out of the loop early stops the
+        traversal without downloading the rest of the catalog.
+
+        Args:
+            params: Search parameters; page is overridden per fetch
+
+        Yields:
+            Product objects in result order
+        """
+        page = 1
+        while True:
+            results = await self.search_products(params.model_copy(update={"page": page}))
+            for product in results.data:
+                yield product
+            if len(results.data) < params.size:
+                return
+            page += 1
+
+    async def _scan_products(
+        self, params: ProductSearchParams, predicate: Callable[[Product], bool], limit: int
+    ) -> list[Product]:
+        """Scan search results until enough matches are found.
+
+        Args:
+            params: Search parameters; size/page are overridden
+            predicate: Filter applied to each product
+            limit: Stop once this many matches are collected
+
+        Returns:
+            Up to limit matching products
+        """
+        scan_budget = self.SCAN_PAGE_SIZE * self.SCAN_MAX_PAGES
+        matches: list[Product] = []
+        scanned = 0
+        async for product in self.iter_products(
+            params.model_copy(update={"size": self.SCAN_PAGE_SIZE})
+        ):
+            scanned += 1
+            if predicate(product):
+                matches.append(product)
+                if len(matches) >= limit:
+                    break
+            if scanned >= scan_budget:
+                break
+        return matches
 
     async def find_deals(
-        self, category: str | None = None, min_discount: float = 0.1
+        self, category: str | None = None, min_discount: float = 0.1, limit: int = 20
     ) -> list[Product]:
         """Find products currently on sale.
 
         Args:
             category: Optional category filter
             min_discount: Minimum discount threshold (default 10%)
+            limit: Maximum number of deals to return
 
         Returns:
             List of products on sale
@@ -115,21 +280,18 @@ class KassalClient:
             store="ODA_NO",
             category=category,
             sort="price_desc",
-            size=100,
         )
-
-        results = await self.search_products(params)
-        deals = [p for p in results.data if p.is_on_sale]
-        return deals
+        return await self._scan_products(params, lambda p: p.is_on_sale, limit)
 
     async def find_high_protein_products(
-        self, search: str | None = None, min_protein: float = 15.0
+        self, search: str | None = None, min_protein: float = 15.0, limit: int = 20
     ) -> list[Product]:
         """Find high-protein products.
 
         Args:
             search: Optional search term
             min_protein: Minimum protein per 100g (default: 15g)
+            limit: Maximum number of products to return
 
         Returns:
             List of high-protein products
@@ -137,16 +299,12 @@ class KassalClient:
         params = ProductSearchParams(
             store="ODA_NO",
             search=search,
-            size=100,
         )
-
-        results = await self.search_products(params)
-        high_protein = [
-            p
-            for p in results.data
-            if p.protein_per_100g and p.protein_per_100g >= min_protein
-        ]
-        return high_protein
+        return await self._scan_products(
+            params,
+            lambda p: (protein := p.protein_per_100g) is not None and protein >= min_protein,
+            limit,
+        )
 
     async def search_by_ingredients(self, ingredients: list[str]) -> dict[str, list[Product]]:
         """Search for products matching a list of ingredients.
@@ -157,14 +315,22 @@ class KassalClient:
         Returns:
             Dictionary mapping ingredient names to matching products
         """
-        results = {}
-        for ingredient in ingredients:
-            params = ProductSearchParams(
-                store="ODA_NO",
-                search=ingredient,
-                size=10,
-                sort="price_asc",
+        # Fan out all searches concurrently; total latency becomes the
+        # slowest round trip instead of the sum of them
+        searches = await asyncio.gather(
+            *(
+                self.search_products(
+                    ProductSearchParams(
+                        store="ODA_NO",
+                        search=ingredient,
+                        size=10,
+                        sort="price_asc",
+                    )
+                )
+                for ingredient in ingredients
             )
-            search_result = await self.search_products(params)
-            results[ingredient] = search_result.data
-        return results
+        )
+        return {
+            ingredient: search_result.data
+            for ingredient, search_result in zip(ingredients, searches)
+        }
@@ -3,12 +3,14 @@
 from datetime import datetime
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class Store(BaseModel):
     """Store information."""
 
+    model_config = {"extra": "ignore", "frozen": True}
+
     name: str
     code: str
     url: str | None = None
@@ -18,6 +20,8 @@ class Store(BaseModel):
 class NutritionItem(BaseModel):
     """Nutrition information per 100g/ml."""
 
+    model_config = {"extra": "ignore", "frozen": True}
+
     code: str
     display_name: str
     amount: float
@@ -27,6 +31,8 @@ class NutritionItem(BaseModel):
 class Allergen(BaseModel):
     """Allergen information."""
 
+    model_config = {"extra": "ignore", "frozen": True}
+
     code: str
     display_name: str
     contains: str  # YES, NO, UNKNOWN, CAN_CONTAIN_TRACES
@@ -35,6 +41,8 @@ class Allergen(BaseModel):
 class PriceHistory(BaseModel):
     """Historical price data."""
 
+    model_config = {"extra": "ignore", "frozen": True}
+
     date: datetime
     price: float
 
@@ -42,6 +50,8 @@ class PriceHistory(BaseModel):
 class Category(BaseModel):
     """Product category."""
 
+    model_config = {"extra": "ignore", "frozen": True}
+
     id: int
     name: str
     depth: int | None = None
@@ -50,7 +60,9 @@ class Category(BaseModel):
 class Product(BaseModel):
     """Product information from Kassal.app API."""
 
-    model_config = {"extra": "ignore"}  # Ignore extra fields from API
+    # Frozen: responses are read-only snapshots, so instances stay
+    # hashable and safe to share through the TTL caches
+    model_config = {"extra": "ignore", "frozen": True}
 
     id: int
     name: str
@@ -73,30 +85,33 @@ class Product(BaseModel):
     allergens: list[Allergen] = Field(default_factory=list)
     price_history: list[PriceHistory] = Field(default_factory=list)
 
+    @model_validator(mode="after")
+    def _precompute_lookups(self) -> "Product":
+        """Precompute nutrient and price aggregates for the hot filter paths."""
+        # Stored in __dict__ directly to stay outside the field machinery
+        self.__dict__["_nutrition_by_code"] = {item.code: item for item in self.nutrition}
+        prices = [entry.price for entry in self.price_history[-10:]]
+        self.__dict__["_avg_recent_price"] = sum(prices) / len(prices) if prices else None
+        return self
+
     @property
     def is_high_protein(self) -> bool:
         """Check if product has high protein content (>10g per 100g)."""
-        for item in self.nutrition:
-            if item.code == "PROTEIN" and item.amount > 10:
-                return True
-        return False
+        protein = self.protein_per_100g
+        return protein is not None and protein > 10
 
     @property
     def protein_per_100g(self) -> float | None:
         """Get protein content per 100g."""
-        for item in self.nutrition:
-            if item.code == "PROTEIN":
-                return item.amount
-        return None
+        item = self._nutrition_by_code.get("PROTEIN")
+        return item.amount if item is not None else None
 
     @property
     def is_on_sale(self) -> bool:
         """Check if product is currently on sale (price lower than recent average)."""
-        if not self.price_history or not self.current_price:
+        avg_price = self._avg_recent_price
+        if not self.current_price or avg_price is None:
             return False
-
-        recent_prices = [p.price for p in self.price_history[-10:]]
-        avg_price = sum(recent_prices) / len(recent_prices)
         return self.current_price < avg_price * 0.9  # 10% discount threshold
 
 
@@ -148,3 +163,35 @@ class ProductSearchParams(BaseModel):
     unique: bool = True  # Collapse duplicates by EAN
     excl_allergens: list[str] | None = None
     has_labels: list[str] | None = None
+
+    # Fields serialized as-is; the two list fields above need joining
+    _SCALAR_FIELDS = (
+        "search",
+        "store",
+        "brand",
+        "category",
+        "price_min",
+        "price_max",
+        "sort",
+        "size",
+        "page",
+        "unique",
+    )
+
+    def to_query(self) -> dict[str, Any]:
+        """Build the httpx query-parameter dict for these search params.
+
+        Booleans are coerced to integers and list fields joined with
+        commas, matching what the Kassal API expects.
+        """
+        query: dict[str, Any] = {}
+        for field in self._SCALAR_FIELDS:
+            value = getattr(self, field)
+            if value is None:
+                continue
+            query[field] = int(value) if isinstance(value, bool) else value
+        if self.excl_allergens:
+            query["excl_allergens"] = ",".join(self.excl_allergens)
+        if self.has_labels:
+            query["has_labels"] = ",".join(self.has_labels)
+        return query
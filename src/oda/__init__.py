@@ -1,7 +1,26 @@
 """Oda.no integration for recipes and shopping cart."""
 
-from .recipes import OdaRecipeScraper, Recipe
-from .cart import OdaCartManager
-from .orders import OdaOrderScraper
+from .models import Recipe
 
 __all__ = ["OdaRecipeScraper", "Recipe", "OdaCartManager", "OdaOrderScraper"]
+
+
+def __getattr__(name: str):
+    """Lazily import the Playwright-backed classes.
+
+    Importing playwright is slow and unnecessary for callers that only
+    need the pydantic models (Kassal- and database-only code paths).
+    """
+    if name == "OdaRecipeScraper":
+        from .recipes import OdaRecipeScraper
+
+        return OdaRecipeScraper
+    if name == "OdaCartManager":
+        from .cart import OdaCartManager
+
+        return OdaCartManager
+    if name == "OdaOrderScraper":
+        from .orders import OdaOrderScraper
+
+        return OdaOrderScraper
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,12 @@
 """Oda.no shopping cart manager using Playwright."""
 
-from playwright.async_api import Page, async_playwright
-from urllib.parse import urljoin
+import asyncio
+import json
+import os
+from collections import deque
+
+from playwright.async_api import Page, async_playwright, expect
+from urllib.parse import quote_plus, urljoin
 
 
 class OdaCartManager:
@@ -9,22 +14,103 @@ class OdaCartManager:
 
     BASE_URL = "https://oda.com/no"
 
-    def __init__(self, email: str, password: str, headless: bool = True):
+    # Shared Chromium kept alive across manager instances; launching the
+    # browser costs seconds, so repeated short-lived operations reuse one
+    # process and only pay for a fresh context
+    _pool_playwright = None
+    _pool_browser = None
+    _pool_launch_key: tuple | None = None
+    _pool_lock = asyncio.Lock()
+
+    # Chromium flags that trim cold start and per-page overhead for
+    # automation sessions
+    _LAUNCH_ARGS = [
+        "--disable-dev-shm-usage",
+        "--disable-extensions",
+        "--disable-background-networking",
+        "--disable-sync",
+        "--disable-translate",
+        "--no-first-run",
+        "--no-default-browser-check",
+        "--disable-blink-features=AutomationControlled",
+    ]
+
+    # Resource types and tracker domains that cart logic never needs;
+    # aborting them cuts page weight and lets the quiescence waiter
+    # settle sooner
+    _BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+    _BLOCKED_URL_FRAGMENTS = (
+        "google-analytics",
+        "googletagmanager",
+        "segment.io",
+        "hotjar",
+        "doubleclick",
+        "facebook.net",
+        "sentry.io",
+    )
+
+    # Injected into every page: counts in-flight fetch/XHR requests so
+    # Python can wait for real quiescence instead of Playwright's
+    # networkidle, which analytics and chat widgets keep alive forever
+    _NETWORK_COUNTER_SCRIPT = """
+    (() => {
+        window.__pendingReqs = 0;
+        window.__lastReqChange = performance.now();
+        const track = (delta) => {
+            window.__pendingReqs += delta;
+            window.__lastReqChange = performance.now();
+        };
+        const origFetch = window.fetch;
+        window.fetch = function (...args) {
+            track(1);
+            return origFetch.apply(this, args).finally(() => track(-1));
+        };
+        const origSend = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function (...args) {
+            track(1);
+            this.addEventListener("loadend", () => track(-1), { once: true });
+            return origSend.apply(this, args);
+        };
+    })();
+    """
+
+    def __init__(
+        self,
+        email: str,
+        password: str,
+        headless: bool = True,
+        block_assets: bool | None = None,
+        storage_path: str = ".oda_state.json",
+        selector_cache_path: str = "oda_selectors.json",
+    ):
         """Initialize Oda cart manager.
 
         Args:
             email: Oda.no account email
             password: Oda.no account password
             headless: Run browser in headless mode (default: True)
+            block_assets: Abort images/fonts/media and tracker requests.
+                Defaults to the headless flag so visual preview sessions
+                keep their assets.
+            storage_path: Where login cookies are persisted between
+                sessions so the UI login flow can be skipped
+            selector_cache_path: Where calibrated selectors are persisted
+                so later sessions skip the fallback ladders entirely
         """
         self.email = email
         self.password = password
         self.headless = headless
-        self.playwright = None
+        self.block_assets = headless if block_assets is None else block_assets
+        self.storage_path = storage_path
         self.browser = None
         self.context = None
         self.page: Page | None = None
         self._is_logged_in = False
+        # Remembers which selector variant won per role so later calls
+        # try the known-good one first instead of the whole OR ladder;
+        # persisted across sessions when selector_cache_path is set
+        self.selector_cache_path = selector_cache_path
+        self._selector_cache: dict[str, str] = self._load_selector_cache()
 
     async def __aenter__(self):
         """Context manager entry - start browser."""
@@ -35,26 +121,242 @@ class OdaCartManager:
         """Context manager exit - close browser."""
         await self.close()
 
+    @classmethod
+    async def _acquire_browser(cls, headless: bool, block_assets: bool):
+        """Get the shared Chromium, launching it on first use.
+
+        Launch options cannot change after the fact, so a request with
+        different headless/asset settings replaces the pooled instance.
+        """
+        launch_key = (headless, block_assets)
+        async with cls._pool_lock:
+            if cls._pool_browser is not None and cls._pool_launch_key != launch_key:
+                await cls.shutdown_pool(_locked=True)
+            if cls._pool_browser is None:
+                args = list(cls._LAUNCH_ARGS)
+                if block_assets:
+                    # Belt and braces with the route blocking: images the
+                    # router misses are never decoded either
+                    args.append("--blink-settings=imagesEnabled=false")
+                cls._pool_playwright = await async_playwright().start()
+                cls._pool_browser = await cls._pool_playwright.chromium.launch(
+                    headless=headless, args=args
+                )
+                cls._pool_launch_key = launch_key
+            return cls._pool_browser
+
+    @classmethod
+    async def shutdown_pool(cls, _locked: bool = False):
+        """Close the shared browser; call once when the process exits."""
+        if not _locked:
+            async with cls._pool_lock:
+                await cls.shutdown_pool(_locked=True)
+            return
+        if cls._pool_browser is not None:
+            await cls._pool_browser.close()
+            cls._pool_browser = None
+        if cls._pool_playwright is not None:
+            await cls._pool_playwright.stop()
+            cls._pool_playwright = None
+        cls._pool_launch_key = None
+
     async def start(self):
         """Start browser session."""
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(headless=self.headless)
-        self.context = await self.browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+        self.browser = await self._acquire_browser(self.headless, self.block_assets)
+        # Headless sessions render for nobody; a smaller viewport means
+        # cheaper layout and raster work. Headed preview keeps full size.
+        viewport = (
+            {"width": 1280, "height": 800} if self.headless else {"width": 1920, "height": 1080}
         )
+        context_kwargs = {
+            "viewport": viewport,
+            "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+        }
+        # Reuse cookies from a previous session so login() can short-circuit
+        if self.storage_path and os.path.exists(self.storage_path):
+            context_kwargs["storage_state"] = self.storage_path
+        self.context = await self.browser.new_context(**context_kwargs)
+        await self.context.add_init_script(self._NETWORK_COUNTER_SCRIPT)
+        if self.block_assets:
+            await self.context.route("**/*", self._block_route)
         self.page = await self.context.new_page()
 
     async def close(self):
-        """Close browser session."""
+        """Close this session's page and context.
+
+        The shared browser stays alive for the next operation; use
+        shutdown_pool() to tear it down at process exit.
+        """
         if self.page:
             await self.page.close()
+            self.page = None
         if self.context:
             await self.context.close()
-        if self.browser:
-            await self.browser.close()
-        if self.playwright:
-            await self.playwright.stop()
+            self.context = None
+        self.browser = None
+
+    async def _block_route(self, route):
+        """Abort requests for assets and trackers; pass everything else."""
+        request = route.request
+        if request.resource_type in self._BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+            return
+        if any(fragment in request.url for fragment in self._BLOCKED_URL_FRAGMENTS):
+            await route.abort()
+            return
+        await route.continue_()
+
+    async def _goto(self, url: str, ready_selector: str, page: Page | None = None):
+        """Navigate and wait for the element the caller needs next.
+
+        wait_until="networkidle" regularly burns its whole timeout on
+        analytics/websocket traffic; waiting for the specific selector
+        the next step interacts with is both faster and more precise.
+        The readiness wait is best-effort — navigation itself has
+        already succeeded if it times out (e.g. an empty cart page).
+
+        Args:
+            url: Destination URL
+            ready_selector: Selector that marks the page as usable
+            page: Optional page to drive instead of the manager default
+        """
+        page = page or self.page
+        await page.goto(url, wait_until="domcontentloaded")
+        try:
+            await page.locator(ready_selector).first.wait_for(state="visible", timeout=10_000)
+        except Exception:
+            pass
+
+    async def _wait_network_quiet(
+        self, idle_ms: int = 500, timeout_ms: int = 5000, page: Page | None = None
+    ):
+        """Wait until no fetch/XHR has been in flight for idle_ms.
+
+        Polls the injected request counter; returns once an idle window
+        is observed or timeout_ms has elapsed, whichever comes first.
+
+        Args:
+            idle_ms: Required quiet window in milliseconds
+            timeout_ms: Upper bound on the total wait
+            page: Optional page to poll instead of the manager default
+        """
+        page = page or self.page
+        deadline = timeout_ms / 1000
+        waited = 0.0
+        while waited < deadline:
+            try:
+                pending, since = await page.evaluate(
+                    "() => [window.__pendingReqs || 0,"
+                    " performance.now() - (window.__lastReqChange || 0)]"
+                )
+            except Exception:
+                return
+            if pending == 0 and since >= idle_ms:
+                return
+            await page.wait_for_timeout(100)
+            waited += 0.1
+
+    _CART_BADGE_SELECTOR = '[data-testid="cart-count"], .cart-badge'
+
+    async def _snapshot_cart_badge(self, page: Page | None = None) -> str | None:
+        """Read the cart badge text, or None if no badge is present."""
+        page = page or self.page
+        try:
+            badge = page.locator(self._CART_BADGE_SELECTOR).first
+            if await badge.count():
+                return await badge.inner_text()
+        except Exception:
+            pass
+        return None
+
+    async def _wait_cart_update(self, badge_before: str | None, page: Page | None = None):
+        """Wait for the cart to reflect an add instead of sleeping.
+
+        Keys on the cart badge changing from its pre-click text; when no
+        badge was found, falls back to waiting for network quiescence.
+
+        Args:
+            badge_before: Badge text snapshotted before the click
+            page: Optional page to watch instead of the manager default
+        """
+        page = page or self.page
+        if badge_before is not None:
+            try:
+                await expect(page.locator(self._CART_BADGE_SELECTOR).first).not_to_have_text(
+                    badge_before, timeout=5000
+                )
+                return
+            except Exception:
+                pass
+        await self._wait_network_quiet(page=page)
+
+    def _load_selector_cache(self) -> dict[str, str]:
+        """Read persisted calibrated selectors, if any."""
+        if not self.selector_cache_path or not os.path.exists(self.selector_cache_path):
+            return {}
+        try:
+            with open(self.selector_cache_path) as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except Exception:
+            return {}
+
+    def _save_selector_cache(self):
+        """Persist the calibrated selectors; best-effort."""
+        if not self.selector_cache_path:
+            return
+        try:
+            with open(self.selector_cache_path, "w") as f:
+                json.dump(self._selector_cache, f, indent=2)
+        except Exception:
+            pass
+
+    async def _click_first(
+        self,
+        role: str,
+        selectors: list[str],
+        timeout: int = 5000,
+        page: Page | None = None,
+    ) -> bool:
+        """Click whichever selector variant matches, caching the winner.
+
+        The selector cached under role is tried first with a short
+        timeout; a staleness or miss falls back to the combined OR
+        ladder, after which the matching variant is re-learned.
+
+        Args:
+            role: Cache key, e.g. "add_to_cart" or "clear_cart"
+            selectors: Selector variants in preference order
+            timeout: Budget for the combined fallback click
+            page: Optional page to drive instead of the manager default
+
+        Returns:
+            True if something was clicked
+        """
+        page = page or self.page
+        cached = self._selector_cache.get(role)
+        if cached is not None:
+            try:
+                await page.locator(cached).first.click(timeout=1500)
+                return True
+            except Exception:
+                del self._selector_cache[role]
+                self._save_selector_cache()
+        try:
+            await page.locator(", ".join(selectors)).first.wait_for(timeout=timeout)
+        except Exception:
+            return False
+        for selector in selectors:
+            try:
+                if await page.locator(selector).count():
+                    await page.locator(selector).first.click(timeout=timeout)
+                    if self._selector_cache.get(role) != selector:
+                        self._selector_cache[role] = selector
+                        self._save_selector_cache()
+                    return True
+            except Exception:
+                continue
+        return False
 
     async def _dismiss_cookie_popup(self):
         """Dismiss cookie consent popup if present.
@@ -66,28 +368,25 @@ class OdaCartManager:
             return
 
         try:
-            # Common cookie popup selectors for Norwegian sites
-            cookie_selectors = [
-                'button:has-text("Godta alle")',
-                'button:has-text("Aksepter")',
-                'button:has-text("Jeg forstår")',
-                'button:has-text("OK")',
-                '[id*="cookie"] button:has-text("Accept")',
-                '[class*="cookie"] button',
-                '[data-testid*="cookie-accept"]',
-                '[aria-label*="cookie" i]',
-            ]
-
-            for selector in cookie_selectors:
-                try:
-                    button = await self.page.query_selector(selector)
-                    if button:
-                        await button.click()
-                        await self.page.wait_for_timeout(1000)
-                        print(f"✓ Dismissed cookie popup using selector: {selector}")
-                        return
-                except Exception:
-                    continue
+            # Common cookie popup selectors for Norwegian sites; comma
+            # joins them into one OR query so the DOM is probed once
+            cookie_selector = ", ".join(
+                [
+                    'button:has-text("Godta alle")',
+                    'button:has-text("Aksepter")',
+                    'button:has-text("Jeg forstår")',
+                    'button:has-text("OK")',
+                    '[id*="cookie"] button:has-text("Accept")',
+                    '[class*="cookie"] button',
+                    '[data-testid*="cookie-accept"]',
+                    '[aria-label*="cookie" i]',
+                ]
+            )
+            button = await self.page.query_selector(cookie_selector)
+            if button:
+                await button.click()
+                await self.page.wait_for_timeout(1000)
+                print("✓ Dismissed cookie popup")
         except Exception as e:
             # Not critical - just log and continue
             print(f"Cookie popup dismissal attempt completed: {e}")
@@ -105,32 +404,28 @@ class OdaCartManager:
             return True
 
         try:
+            # A restored storage state may already be authenticated;
+            # check the homepage before driving the login form
+            if self.storage_path and os.path.exists(self.storage_path):
+                await self._goto(self.BASE_URL, 'a[href*="account"]')
+                if await self.page.locator(
+                    'a[href*="account"], button:has-text("Min konto")'
+                ).count():
+                    self._is_logged_in = True
+                    return True
+
             # Go directly to login page
             login_url = f"{self.BASE_URL}/user/login/"
-            await self.page.goto(login_url, wait_until="networkidle")
+            await self._goto(login_url, "#email-input")
 
             # Dismiss cookie popup if present
             await self._dismiss_cookie_popup()
 
-            # Wait for login form (try multiple selectors)
-            email_selectors = [
-                'input[type="email"]',
-                'input[name="email"]',
-                'input[name="username"]',
-                'input[id="email"]',
-                '#email',
-            ]
-
-            email_input = None
-            for selector in email_selectors:
-                try:
-                    email_input = await self.page.wait_for_selector(selector, timeout=5000)
-                    if email_input:
-                        break
-                except Exception:
-                    continue
-
-            if not email_input:
+            # Wait for the actual field the fill below targets; the old
+            # multi-selector discovery produced a handle nothing used
+            try:
+                await self.page.locator("#email-input").wait_for(state="visible", timeout=10_000)
+            except Exception:
                 # If still not found, take a screenshot for debugging
                 await self.page.screenshot(path="login_page_debug.png")
                 raise RuntimeError("Could not find email input field. Screenshot saved to login_page_debug.png")
@@ -142,30 +437,20 @@ class OdaCartManager:
             await self.page.wait_for_timeout(500)
 
             # Submit form - look for submit button and click with JavaScript
-            submit_selectors = [
-                'button:has-text("Logg inn")',
-                'button[type="submit"]',
-                'button:has-text("Log in")',
-                'input[type="submit"]',
-            ]
-
-            button_clicked = False
-            for selector in submit_selectors:
-                try:
-                    button = await self.page.query_selector(selector)
-                    if button:
-                        # Use JavaScript click for reliability
-                        await button.evaluate("element => element.click()")
-                        button_clicked = True
-                        print(f"Clicked login button: {selector}")
-                        break
-                except Exception as e:
-                    print(f"Could not click {selector}: {e}")
-                    continue
-
-            if not button_clicked:
+            submit_selector = ", ".join(
+                [
+                    'button:has-text("Logg inn")',
+                    'button[type="submit"]',
+                    'button:has-text("Log in")',
+                    'input[type="submit"]',
+                ]
+            )
+            button = await self.page.query_selector(submit_selector)
+            if not button:
                 await self.page.screenshot(path="login_button_not_found.png")
                 raise RuntimeError("Could not click login button")
+            # Use JavaScript click for reliability
+            await button.evaluate("element => element.click()")
 
             # Wait for navigation after login (longer timeout)
             await self.page.wait_for_timeout(3000)
@@ -197,135 +482,134 @@ class OdaCartManager:
                 print(f"  - Login button still visible: {login_button_visible}")
 
             self._is_logged_in = is_logged_in
+            if is_logged_in and self.storage_path:
+                # Persist cookies so the next session skips the UI login
+                await self.context.storage_state(path=self.storage_path)
             return is_logged_in
 
         except Exception as e:
             print(f"Login failed: {e}")
             return False
 
-    async def add_product_by_url(self, product_url: str, quantity: int = 1) -> bool:
+    async def add_product_by_url(
+        self, product_url: str, quantity: int = 1, page: Page | None = None
+    ) -> bool:
         """Add a product to cart by navigating to its URL.
 
         Args:
             product_url: URL to product page on Oda.no
             quantity: Quantity to add (default: 1)
+            page: Optional page to use instead of the manager's default,
+                so callers can run several adds concurrently
 
         Returns:
             True if product was added successfully
         """
-        if not self.page:
+        page = page or self.page
+        if not page:
             raise RuntimeError("Browser not started. Call start() first.")
 
         if not self._is_logged_in:
             await self.login()
 
         try:
-            await self.page.goto(product_url, wait_until="networkidle")
+            await self._goto(
+                product_url,
+                'button:has-text("Legg til i handlekurven"), button:has-text("Legg i handlekurv")',
+                page=page,
+            )
 
             # Product page opens modal - look for "Legg til i handlekurven" button
             add_button_selectors = [
                 'button:has-text("Legg til i handlekurven")',
                 'button:has-text("Legg i handlekurv")',
                 'button[aria-label*="Legg i handlekurv"]',
-                'button.add-to-cart',
+                "button.add-to-cart",
                 '[data-testid="add-to-cart"]',
             ]
 
             # Set quantity if needed
             if quantity > 1:
-                quantity_selectors = [
-                    'input[type="number"]',
-                    'input[aria-label*="Antall"]',
-                    '.quantity-input',
-                ]
-
-                for selector in quantity_selectors:
-                    try:
-                        await self.page.fill(selector, str(quantity), timeout=3000)
-                        break
-                    except Exception:
-                        continue
-
-            # Click add to cart button
-            for selector in add_button_selectors:
+                quantity_selector = ", ".join(
+                    [
+                        'input[type="number"]',
+                        'input[aria-label*="Antall"]',
+                        ".quantity-input",
+                    ]
+                )
                 try:
-                    await self.page.click(selector, timeout=5000)
-                    break
+                    await page.locator(quantity_selector).first.fill(str(quantity), timeout=3000)
                 except Exception:
-                    continue
-
-            # Wait a moment for cart to update
-            await self.page.wait_for_timeout(2000)
+                    pass
 
-            return True
+            # Fuse the click with the wait for the cart API response:
+            # control returns the moment the server confirms the add
+            badge_before = await self._snapshot_cart_badge(page)
+            clicked = False
+            try:
+                async with page.expect_response(
+                    lambda r: "/cart" in r.url and r.request.method in ("POST", "PUT"),
+                    timeout=5000,
+                ) as response_info:
+                    clicked = await self._click_first(
+                        "add_to_cart", add_button_selectors, page=page
+                    )
+                if not clicked:
+                    return False
+                response = await response_info.value
+                return response.ok
+            except Exception:
+                # expect_response times out on exit when no matching
+                # request fired; without a click that is a plain failure,
+                # not something to paper over with fallback waits
+                if not clicked:
+                    return False
+                # Confirmed click but no observed response (markup change,
+                # cache-served cart): fall back to the badge/quiescence
+                # wait before declaring success
+                await self._wait_cart_update(badge_before, page=page)
+                return True
 
         except Exception as e:
             print(f"Failed to add product {product_url}: {e}")
             return False
 
-    async def add_product_by_search(self, product_name: str, quantity: int = 1) -> bool:
+    async def add_product_by_search(
+        self, product_name: str, quantity: int = 1, page: Page | None = None
+    ) -> bool:
         """Add a product to cart by searching for it.
 
         Args:
             product_name: Name of product to search for
             quantity: Quantity to add (default: 1)
+            page: Optional page to use instead of the manager's default,
+                so callers can run several adds concurrently
 
         Returns:
             True if product was added successfully
         """
-        if not self.page:
+        page = page or self.page
+        if not page:
             raise RuntimeError("Browser not started. Call start() first.")
 
         if not self._is_logged_in:
             await self.login()
 
         try:
-            # CRITICAL: Reload homepage completely to reset ALL state
-            await self.page.goto(self.BASE_URL, wait_until="domcontentloaded")
-            await self.page.wait_for_timeout(2000)
-            await self.page.wait_for_load_state("networkidle", timeout=10000)
-
-            # Find and use search box
-            search_input = await self.page.query_selector('input[type="search"]')
-            if not search_input:
-                print("Could not find search box")
-                return False
-
-            # CRITICAL: Clear search box completely first!
-            await search_input.click()
-            await search_input.fill("")  # Clear
-            await self.page.wait_for_timeout(500)
-
-            # Type the ACTUAL product name
-            await search_input.type(product_name, delay=100)  # Slower typing
-            await self.page.wait_for_timeout(500)
-
-            # Submit search and wait for navigation to search results page
-            current_url = self.page.url
-            await search_input.press("Enter")
-
-            # CRITICAL: Wait for URL to change to search results page
-            # The URL should change from homepage to something like /search/?q=...
-            try:
-                await self.page.wait_for_url(
-                    lambda url: url != current_url and ("/search" in url or "q=" in url),
-                    timeout=10000
-                )
-                print(f"  ✓ Navigated to search results: {self.page.url}")
-            except Exception:
-                print(f"  ⚠ URL didn't change, may still be on homepage")
-
-            # Wait for search results to load - CRITICAL!
-            await self.page.wait_for_timeout(2000)  # Wait for search to complete
-            await self.page.wait_for_load_state("networkidle", timeout=10000)
-            await self.page.wait_for_timeout(1000)  # Extra wait for dynamic content
+            # Navigate straight to the canonical search URL; the old
+            # homepage-load + type + Enter dance was three round trips
+            # for the same destination, and a fresh navigation resets
+            # page state just as thoroughly
+            search_url = f"{self.BASE_URL}/search/?q={quote_plus(product_name)}"
+            await self._goto(search_url, "main article", page=page)
+            await self._wait_network_quiet(page=page)
 
             # NEW STRATEGY: Find the "Legg til" button that belongs to our searched product
             # by checking the button's parent container for the product name
             # AVOID pre-cut/pre-packaged products (staver, kuttet, ferdig, etc.)
             try:
                 # Get ALL "Legg til" buttons on the page
-                all_buttons = await self.page.query_selector_all('button[aria-label*="Legg til"]')
+                all_buttons = await page.query_selector_all('button[aria-label*="Legg til"]')
                 print(f"  Found {len(all_buttons)} 'Legg til' buttons on page")
 
                 # Keywords to AVOID (pre-cut, pre-packaged, expensive options)
@@ -401,10 +685,11 @@ class OdaCartManager:
                     print(f"    Product: {best_match['text'][:60]}...")
 
                     # Click THIS button
+                    badge_before = await self._snapshot_cart_badge(page)
                     await best_match["button"].evaluate("button => button.click()")
                     print(f"  ✓ Clicked 'Legg til' button")
                     clicked = True
-                    await self.page.wait_for_timeout(1500)
+                    await self._wait_cart_update(badge_before, page=page)
                     return True
 
                 if not clicked:
@@ -412,17 +697,23 @@ class OdaCartManager:
                     # Fallback: try clicking product card to open modal
                     print(f"  Trying fallback: click first article...")
 
-                    article = await self.page.query_selector('main article:first-of-type')
+                    article = await page.query_selector('main article:first-of-type')
                     if article:
                         await article.evaluate("el => el.click()")
-                        await self.page.wait_for_timeout(2000)
+                        try:
+                            await page.locator('dialog[open], [role="dialog"]').first.wait_for(
+                                state="visible", timeout=5000
+                            )
+                        except Exception:
+                            pass
 
                         # In modal, click "Legg til i handlekurven"
-                        modal_button = await self.page.query_selector('button:has-text("Legg til i handlekurven")')
+                        modal_button = await page.query_selector('button:has-text("Legg til i handlekurven")')
                         if modal_button:
+                            badge_before = await self._snapshot_cart_badge(page)
                             await modal_button.evaluate("btn => btn.click()")
                             print(f"  ✓ Clicked via modal fallback")
-                            await self.page.wait_for_timeout(1500)
+                            await self._wait_cart_update(badge_before, page=page)
                             return True
 
                     return False
@@ -435,6 +726,56 @@ class OdaCartManager:
             print(f"Failed to add product by search '{product_name}': {e}")
             return False
 
+    async def add_products(
+        self, items: list[dict], concurrency: int = 4
+    ) -> list[dict]:
+        """Add several products to the cart concurrently.
+
+        Workers draw from a small pool of pages in the shared logged-in
+        context, so the round trips to Oda.no overlap without repeating
+        the login.
+
+        Args:
+            items: Dicts with either "url" or "name", plus optional
+                "quantity" (default 1)
+            concurrency: Maximum simultaneous page operations
+
+        Returns:
+            One dict per input item with "item" and "success" keys,
+            in input order
+        """
+        if not self.context:
+            raise RuntimeError("Browser not started. Call start() first.")
+
+        if not self._is_logged_in:
+            await self.login()
+
+        concurrency = max(1, min(concurrency, len(items) or 1))
+        pages = deque([await self.context.new_page() for _ in range(concurrency)])
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def add_one(item: dict) -> dict:
+            async with semaphore:
+                page = pages.popleft()
+                try:
+                    if "url" in item:
+                        success = await self.add_product_by_url(
+                            item["url"], item.get("quantity", 1), page=page
+                        )
+                    else:
+                        success = await self.add_product_by_search(
+                            item["name"], item.get("quantity", 1), page=page
+                        )
+                finally:
+                    pages.append(page)
+            return {"item": item.get("name", item.get("url")), "success": success}
+
+        try:
+            return list(await asyncio.gather(*(add_one(item) for item in items)))
+        finally:
+            for page in pages:
+                await page.close()
+
     async def search_products(
         self,
         product_name: str,
@@ -459,41 +800,10 @@ class OdaCartManager:
             await self.login()
 
         try:
-            # Reload homepage to reset state (same as add_product_by_search)
-            await self.page.goto(self.BASE_URL, wait_until="domcontentloaded")
-            await self.page.wait_for_timeout(2000)
-            await self.page.wait_for_load_state("networkidle", timeout=10000)
-
-            # Find and use search box
-            search_input = await self.page.query_selector('input[type="search"]')
-            if not search_input:
-                print("Could not find search box")
-                return []
-
-            # Clear and type product name
-            await search_input.click()
-            await search_input.fill("")
-            await self.page.wait_for_timeout(500)
-            await search_input.type(product_name, delay=100)
-            await self.page.wait_for_timeout(500)
-
-            # Submit search
-            current_url = self.page.url
-            await search_input.press("Enter")
-
-            # Wait for search results page
-            try:
-                await self.page.wait_for_url(
-                    lambda url: url != current_url and ("/search" in url or "q=" in url),
-                    timeout=10000
-                )
-            except Exception:
-                pass
-
-            # Wait for results to load
-            await self.page.wait_for_timeout(2000)
-            await self.page.wait_for_load_state("networkidle", timeout=10000)
-            await self.page.wait_for_timeout(1000)
+            # Direct search-URL navigation (same as add_product_by_search)
+            search_url = f"{self.BASE_URL}/search/?q={quote_plus(product_name)}"
+            await self._goto(search_url, "main article")
+            await self._wait_network_quiet()
 
             # Extract product cards
             product_cards = await self.page.query_selector_all('main article')
@@ -586,6 +896,42 @@ class OdaCartManager:
             print(f"Failed to search products for '{product_name}': {e}")
             return []
 
+    async def _get_cart_items_via_api(self) -> list[dict] | None:
+        """Fetch the cart from Oda's JSON endpoint, if it cooperates.
+
+        Uses the context's request client, which shares the logged-in
+        cookies — one HTTP call instead of a page load plus DOM parse.
+
+        Returns:
+            Cart items, or None when the endpoint or payload shape is
+            unavailable and the DOM fallback should run
+        """
+        try:
+            response = await self.context.request.get(f"{self.BASE_URL}/api/v1/cart/")
+            if not response.ok:
+                return None
+            payload = await response.json()
+        except Exception:
+            return None
+        entries = payload.get("items") if isinstance(payload, dict) else payload
+        if not isinstance(entries, list):
+            return None
+        items = []
+        for entry in entries:
+            if not isinstance(entry, dict):
+                return None
+            product = entry.get("product", entry)
+            items.append(
+                {
+                    "name": product.get("name", "Unknown"),
+                    "quantity": str(entry.get("quantity", "1")),
+                    "price": str(
+                        entry.get("total_price", product.get("gross_price", "N/A"))
+                    ),
+                }
+            )
+        return items
+
     async def get_cart_items(self) -> list[dict]:
         """Get items currently in the shopping cart.
 
@@ -598,40 +944,28 @@ class OdaCartManager:
         if not self._is_logged_in:
             await self.login()
 
+        # Try the JSON endpoint first; the DOM walk below is the fallback
+        api_items = await self._get_cart_items_via_api()
+        if api_items is not None:
+            return api_items
+
         try:
             # Navigate to cart
             cart_url = f"{self.BASE_URL}/cart/"
-            await self.page.goto(cart_url, wait_until="networkidle")
-
-            # Parse cart items
-            items = []
-            item_selectors = [
-                '.cart-item',
-                '[data-testid="cart-item"]',
-                '.checkout-item',
-            ]
-
-            for selector in item_selectors:
-                elements = await self.page.query_selector_all(selector)
-                if elements:
-                    for elem in elements:
-                        try:
-                            name = await elem.query_selector(".product-name, .item-name")
-                            quantity = await elem.query_selector(".quantity, .item-quantity")
-                            price = await elem.query_selector(".price, .item-price")
-
-                            items.append(
-                                {
-                                    "name": await name.inner_text() if name else "Unknown",
-                                    "quantity": await quantity.inner_text() if quantity else "1",
-                                    "price": await price.inner_text() if price else "N/A",
-                                }
-                            )
-                        except Exception:
-                            continue
-                    break
-
-            return items
+            await self._goto(cart_url, '.cart-item, [data-testid="cart-item"], .checkout-item')
+
+            # Extract all items in one evaluate call: the DOM walk runs
+            # in-browser and returns ready dicts, instead of three CDP
+            # round-trips per cart item
+            item_selector = '.cart-item, [data-testid="cart-item"], .checkout-item'
+            return await self.page.evaluate(
+                """(sel) => Array.from(document.querySelectorAll(sel)).map((e) => ({
+                    name: e.querySelector('.product-name, .item-name')?.innerText ?? 'Unknown',
+                    quantity: e.querySelector('.quantity, .item-quantity')?.innerText ?? '1',
+                    price: e.querySelector('.price, .item-price')?.innerText ?? 'N/A',
+                }))""",
+                item_selector,
+            )
 
         except Exception as e:
             print(f"Failed to get cart items: {e}")
@@ -652,7 +986,7 @@ class OdaCartManager:
         try:
             # Navigate to cart
             cart_url = f"{self.BASE_URL}/cart/"
-            await self.page.goto(cart_url, wait_until="networkidle")
+            await self._goto(cart_url, '.cart-item, [data-testid="cart-item"], .checkout-item')
 
             # Look for "Clear cart" or "Remove all" button
             clear_selectors = [
@@ -660,26 +994,18 @@ class OdaCartManager:
                 'button:has-text("Fjern alle")',
                 '[data-testid="clear-cart"]',
             ]
+            if not await self._click_first("clear_cart", clear_selectors):
+                return False
 
-            for selector in clear_selectors:
-                try:
-                    await self.page.click(selector, timeout=5000)
-
-                    # Confirm if there's a confirmation dialog
-                    confirm_selectors = ['button:has-text("Ja")', 'button:has-text("Bekreft")']
-
-                    for confirm_selector in confirm_selectors:
-                        try:
-                            await self.page.click(confirm_selector, timeout=3000)
-                            break
-                        except Exception:
-                            continue
-
-                    return True
-                except Exception:
-                    continue
+            # Confirm if there's a confirmation dialog
+            try:
+                await self.page.locator(
+                    'button:has-text("Ja"), button:has-text("Bekreft")'
+                ).first.click(timeout=3000)
+            except Exception:
+                pass
 
-            return False
+            return True
 
         except Exception as e:
             print(f"Failed to clear cart: {e}")
@@ -704,7 +1030,7 @@ class OdaCartManager:
 
         # Navigate to cart
         cart_url = f"{self.BASE_URL}/cart/"
-        await self.page.goto(cart_url, wait_until="networkidle")
+        await self._goto(cart_url, '.cart-item, [data-testid="cart-item"], .checkout-item')
 
         # Dismiss cookie popup for clean preview
         await self._dismiss_cookie_popup()
@@ -731,26 +1057,31 @@ class OdaCartManager:
         Returns:
             Dictionary with cart summary and total price
         """
-        items = await self.get_cart_items()
-
-        # Navigate to checkout page (but don't complete)
+        # One navigation: the checkout page lists the cart contents, so
+        # items and total are read together in a single evaluate call
         checkout_url = f"{self.BASE_URL}/checkout"
-        await self.page.goto(checkout_url, wait_until="networkidle")
-
-        # Extract total price
-        total_price = "N/A"
-        try:
-            total_element = await self.page.query_selector(
-                '.total-price, [data-testid="total-price"]'
-            )
-            if total_element:
-                total_price = await total_element.inner_text()
-        except Exception:
-            pass
+        await self._goto(checkout_url, '.total-price, [data-testid="total-price"]')
+
+        summary = await self.page.evaluate(
+            """() => ({
+                items: Array.from(
+                    document.querySelectorAll(
+                        '.cart-item, [data-testid="cart-item"], .checkout-item'
+                    )
+                ).map((e) => ({
+                    name: e.querySelector('.product-name, .item-name')?.innerText ?? 'Unknown',
+                    quantity: e.querySelector('.quantity, .item-quantity')?.innerText ?? '1',
+                    price: e.querySelector('.price, .item-price')?.innerText ?? 'N/A',
+                })),
+                total: document.querySelector(
+                    '.total-price, [data-testid="total-price"]'
+                )?.innerText ?? 'N/A',
+            })"""
+        )
 
         return {
-            "items": items,
-            "total_price": total_price,
+            "items": summary["items"],
+            "total_price": summary["total"],
             "status": "READY_FOR_CHECKOUT",
             "message": "Cart is ready. User must manually complete checkout in browser.",
         }